@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 import os
 from dotenv import load_dotenv
 
@@ -12,6 +11,27 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Methods offered in the Calculator selectbox
+METHODS = ("standard", "reduced")
+METHOD_LABELS = {m: m.replace('_', ' ').title() for m in METHODS}
+
+# (service, env var) pairs shown in the Setup Guide's Environment Status
+SERVICE_ENV_VARS = (
+    ("Supabase", "SUPABASE_URL"),
+    ("ClickHouse", "CLICKHOUSE_HOST"),
+)
+
+@st.cache_resource
+def get_letter_values():
+    """Build the letter -> value tables once per process (shared across reruns)"""
+    standard = {chr(i + 96): i for i in range(1, 27)}
+    reduced = {chr(i + 96): ((i - 1) % 9) + 1 for i in range(1, 27)}
+    return {
+        'standard': standard,
+        'ordinal': standard,
+        'reduced': reduced,
+    }
+
 def calculate_gematria(text, method="standard"):
     """Calculate gematria value using different methods
     
@@ -20,12 +40,8 @@ def calculate_gematria(text, method="standard"):
     - ordinal: Simple Gematria (same as standard for compatibility)
     - reduced: Pythagorean reduction (A=1, B=2, ..., I=9, J=1, K=2, ...)
     """
-    if method == 'standard' or method == 'ordinal':
-        values = {chr(i + 96): i for i in range(1, 27)}
-    elif method == 'reduced':
-        values = {chr(i + 96): ((i - 1) % 9) + 1 for i in range(1, 27)}
-    else:
-        values = {chr(i + 96): i for i in range(1, 27)}
+    tables = get_letter_values()
+    values = tables.get(method, tables['standard'])
     
     total = 0
     text = text.lower()
@@ -35,21 +51,26 @@ def calculate_gematria(text, method="standard"):
     
     return total
 
-def main():
-    st.title("🐝 Gematria Hive")
-    st.markdown("### Self-scaffolding MCP for gematria unification")
+@st.cache_data(max_entries=1000, show_spinner=False)
+def calculate_with_breakdown(text, method="standard"):
+    """Calculate the total and per-character breakdown (memoized per text/method)"""
+    breakdown_data = []
+    for char in text.lower():
+        if char.isalpha():
+            breakdown_data.append({
+                "Character": char.upper(),
+                "Value": calculate_gematria(char, method)
+            })
     
-    with st.sidebar:
-        st.header("Navigation")
-        page = st.radio(
-            "Select a page:",
-            ["Calculator", "About", "Setup Guide"]
-        )
+    return calculate_gematria(text, method), breakdown_data
+
+@st.fragment
+def render_calculator():
+    """Calculator panel; widget interactions rerun only this fragment"""
+    st.header("Gematria Calculator")
+    st.markdown("Enter text to calculate its gematria value.")
     
-    if page == "Calculator":
-        st.header("Gematria Calculator")
-        st.markdown("Enter text to calculate its gematria value.")
-        
+    with st.form("calc", clear_on_submit=False):
         col1, col2 = st.columns([2, 1])
         
         with col1:
@@ -62,32 +83,39 @@ def main():
         with col2:
             method = st.selectbox(
                 "Calculation method:",
-                ["standard", "reduced"],
+                METHODS,
+                format_func=METHOD_LABELS.get,
                 help="Standard: A=1, B=2...Z=26 | Reduced: Pythagorean (A=1...I=9, J=1...)"
             )
         
-        if st.button("Calculate", type="primary"):
-            if text_input:
-                result = calculate_gematria(text_input, method)
-                st.success(f"**Gematria Value:** {result}")
-                
-                st.divider()
-                st.subheader("Character Breakdown")
-                
-                breakdown_data = []
-                for char in text_input.lower():
-                    if char.isalpha():
-                        value = calculate_gematria(char, method)
-                        breakdown_data.append({
-                            "Character": char.upper(),
-                            "Value": value
-                        })
-                
-                if breakdown_data:
-                    df = pd.DataFrame(breakdown_data)
-                    st.dataframe(df, use_container_width=True)
-            else:
-                st.warning("Please enter some text to calculate.")
+        submitted = st.form_submit_button("Calculate", type="primary")
+    
+    if submitted:
+        if text_input:
+            result, breakdown_data = calculate_with_breakdown(text_input, method)
+            st.success(f"**Gematria Value:** {result}")
+            
+            st.divider()
+            st.subheader("Character Breakdown")
+            
+            if breakdown_data:
+                st.dataframe(breakdown_data, use_container_width=True)
+        else:
+            st.warning("Please enter some text to calculate.")
+
+def main():
+    st.title("🐝 Gematria Hive")
+    st.markdown("### Self-scaffolding MCP for gematria unification")
+    
+    with st.sidebar:
+        st.header("Navigation")
+        page = st.radio(
+            "Select a page:",
+            ["Calculator", "About", "Setup Guide"]
+        )
+    
+    if page == "Calculator":
+        render_calculator()
     
     elif page == "About":
         st.header("About Gematria Hive")
@@ -161,22 +189,14 @@ def main():
         
         st.subheader("Environment Status")
         
-        supabase_configured = bool(os.getenv("SUPABASE_URL"))
-        clickhouse_configured = bool(os.getenv("CLICKHOUSE_HOST"))
+        columns = st.columns(len(SERVICE_ENV_VARS))
         
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            if supabase_configured:
-                st.success("✅ Supabase configured")
-            else:
-                st.info("ℹ️ Supabase not configured (optional for v0.1)")
-        
-        with col2:
-            if clickhouse_configured:
-                st.success("✅ ClickHouse configured")
-            else:
-                st.info("ℹ️ ClickHouse not configured (optional for v0.1)")
+        for col, (service, env_var) in zip(columns, SERVICE_ENV_VARS):
+            with col:
+                if os.getenv(env_var):
+                    st.success(f"✅ {service} configured")
+                else:
+                    st.info(f"ℹ️ {service} not configured (optional for v0.1)")
 
 if __name__ == "__main__":
     main()
@@ -14,13 +14,16 @@ Date: November 6, 2025
 import os
 import json
 import logging
+import time
+import sys
+import importlib.util
 from typing import List, Dict, Tuple, Optional
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 # Core dependencies
 from supabase import create_client, Client
-from sentence_transformers import SentenceTransformer, util
-import pandas as pd
 
 # Performance optimizations
 try:
@@ -30,19 +33,32 @@ except ImportError:
     HAS_STRINGZILLA = False
     print("Warning: stringzilla not installed, using standard string ops")
 
-# Future-proofed libraries (some may be optional for pass #1)
 try:
-    from pixeltable import create_dir, create_table, udf, Array, String, Float32
-    HAS_PIXELTABLE = True
+    import orjson  # Fast JSON (de)serialization
+    HAS_ORJSON = True
 except ImportError:
-    HAS_PIXELTABLE = False
+    HAS_ORJSON = False
+    print("Warning: orjson not installed, using standard json")
+
+# Future-proofed libraries (some may be optional for pass #1)
+# Unused in pass #1, so only probe for them instead of paying their import cost.
+# Probes take top-level package names only: find_spec on a dotted name would
+# import the parent package. A probe confirms the package is installed, not that
+# it (or any submodule/export the old imports named) imports cleanly.
+def _has_module(name: str) -> bool:
+    """Return True if top-level package `name` is installed; nothing is imported."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ValueError:  # already in sys.modules with no __spec__
+        return True
+
+
+HAS_PIXELTABLE = _has_module('pixeltable')
+if not HAS_PIXELTABLE:
     print("Warning: pixeltable not installed, using direct Supabase ingestion")
 
-try:
-    from langchain.agents import create_react_agent
-    HAS_LANGCHAIN = True
-except ImportError:
-    HAS_LANGCHAIN = False
+HAS_LANGCHAIN = _has_module('langchain')  # weaker than importing langchain.agents
+if not HAS_LANGCHAIN:
     print("Warning: langchain not installed, agent features disabled")
 
 try:
@@ -52,11 +68,8 @@ except ImportError:
     HAS_LANGGRAPH = False
     print("Warning: langgraph not installed, graph flows disabled")
 
-try:
-    from vllm import LLM
-    HAS_VLLM = True
-except ImportError:
-    HAS_VLLM = False
+HAS_VLLM = _has_module('vllm')
+if not HAS_VLLM:
     print("Warning: vllm not installed, using standard inference")
 
 # Image/OCR processing
@@ -78,12 +91,12 @@ except ImportError:
     HAS_SCRAPING = False
     print("Warning: scraping libraries not installed, URL pulls disabled")
 
+# C-based parser backend for BeautifulSoup (bs4 imports it itself)
+HTML_PARSER = 'lxml' if _has_module('lxml') else 'html.parser'
+
 # Quantum sims (future-proofing)
-try:
-    import qiskit
-    HAS_QISKIT = True
-except ImportError:
-    HAS_QISKIT = False
+HAS_QISKIT = _has_module('qiskit')
+if not HAS_QISKIT:
     print("Warning: qiskit not installed, quantum sims disabled")
 
 # Load environment variables
@@ -97,12 +110,30 @@ SUPABASE_KEY = os.getenv('SUPABASE_KEY')
 if not SUPABASE_URL or not SUPABASE_KEY:
     raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in environment variables")
 
+class CachedTimeFormatter(logging.Formatter):
+    """Formatter that reuses the strftime result for records logged in the same second."""
+    
+    _cached_second = None
+    _cached_time = ''
+    
+    def formatTime(self, record, datefmt=None):
+        second = int(record.created)
+        if second != self._cached_second:
+            self._cached_time = time.strftime(datefmt or self.default_time_format,
+                                              self.converter(record.created))
+            self._cached_second = second
+        if datefmt:
+            return self._cached_time
+        return self.default_msec_format % (self._cached_time, record.msecs)
+
+
 # Logging setup (consolidate to file/console for full visibility/hunches)
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+file_handler = logging.FileHandler('ingestion_log.txt', mode='a')  # Append mode
+file_handler.setFormatter(CachedTimeFormatter(LOG_FORMAT))
 logging.basicConfig(
-    filename='ingestion_log.txt',
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    filemode='a'  # Append mode
+    handlers=[file_handler]
 )
 logger = logging.getLogger()
 console_handler = logging.StreamHandler()
@@ -120,11 +151,30 @@ VISION_KEYWORDS = [
 # Supabase client (consolidate connection)
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-# Embedding model (consolidate for relevance scoring)
-embed_model = SentenceTransformer('all-MiniLM-L6-v2')
-vision_embeds = embed_model.encode(VISION_KEYWORDS)  # Pre-embed for cosine checks
 
-logger.info(f"Initialized with {len(VISION_KEYWORDS)} vision keywords")
+# Embedding model (consolidate for relevance scoring). Loaded by run_ingestion_pass1
+# once data has been pulled, so runs with no data never pay the torch startup cost.
+@lru_cache(maxsize=1)
+def get_embed_model():
+    """Load the shared SentenceTransformer model once per process."""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer('all-MiniLM-L6-v2')
+
+
+@lru_cache(maxsize=1)
+def get_vision_embeds():
+    """Pre-embed VISION_KEYWORDS once for cosine checks."""
+    return get_embed_model().encode(VISION_KEYWORDS)
+
+
+logger.info("Initialized with %d vision keywords", len(VISION_KEYWORDS))
+
+# Rule line for CLI/log banners
+BANNER_RULE = "=" * 60
+
+# Supabase insert batching (rows per request, concurrent requests in flight)
+INSERT_CHUNK_SIZE = 50
+INSERT_MAX_WORKERS = 4
 
 
 def pull_data(source: str = 'dewey_json.json') -> List[Dict]:
@@ -141,14 +191,18 @@ def pull_data(source: str = 'dewey_json.json') -> List[Dict]:
     
     if source.endswith('.json'):
         try:
-            with open(source, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            logger.info(f"Loaded {len(data)} items from JSON file: {source}")
+            if HAS_ORJSON:
+                with open(source, 'rb') as f:
+                    data = orjson.loads(f.read())
+            else:
+                with open(source, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            logger.info("Loaded %d items from JSON file: %s", len(data), source)
         except FileNotFoundError:
-            logger.error(f"JSON file not found: {source}")
+            logger.error("JSON file not found: %s", source)
             return []
         except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON in {source}: {e}")
+            logger.error("Invalid JSON in %s: %s", source, e)
             return []
             
     elif HAS_OCR and (source.endswith('.jpg') or source.endswith('.png') or 
@@ -157,13 +211,13 @@ def pull_data(source: str = 'dewey_json.json') -> List[Dict]:
         try:
             img = cv2.imread(source)
             if img is None:
-                logger.error(f"Could not read image: {source}")
+                logger.error("Could not read image: %s", source)
                 return []
             text = pytesseract.image_to_string(Image.fromarray(img))
             data = [{'url': source, 'summary': text, 'tags': []}]
-            logger.info(f"Extracted text from image: {source}")
+            logger.info("Extracted text from image: %s", source)
         except Exception as e:
-            logger.error(f"Error processing image {source}: {e}")
+            logger.error("Error processing image %s: %s", source, e)
             return []
             
     elif HAS_SCRAPING and source.startswith('http'):
@@ -171,18 +225,18 @@ def pull_data(source: str = 'dewey_json.json') -> List[Dict]:
         try:
             response = requests.get(source, timeout=10)
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = BeautifulSoup(response.text, HTML_PARSER)
             text = soup.get_text()
             data = [{'url': source, 'summary': text, 'tags': []}]
-            logger.info(f"Scraped content from URL: {source}")
+            logger.info("Scraped content from URL: %s", source)
         except Exception as e:
-            logger.error(f"Error scraping URL {source}: {e}")
+            logger.error("Error scraping URL %s: %s", source, e)
             return []
     else:
-        logger.error(f"Unsupported source type: {source}")
+        logger.error("Unsupported source type: %s", source)
         return []
     
-    logger.info(f"Pulled {len(data)} items from {source}")
+    logger.info("Pulled %d items from %s", len(data), source)
     return data
 
 
@@ -196,27 +250,116 @@ def categorize_relevance(item: Dict) -> Tuple[str, float, List[str]]:
     Returns:
         Tuple of (phase, max_score, tags)
     """
-    if not item.get('summary'):
-        return 'phase1_basic', 0.0, []
+    results, _ = categorize_relevance_batch([item])
+    return results[0]
+
+
+def categorize_relevance_batch(items: List[Dict]) -> Tuple[List[Tuple[str, float, List[str]]], List]:
+    """
+    Batch relevance scoring: one encode and one cos_sim call for all items.
+    
+    Args:
+        items: List of dictionaries with 'summary' keys
+        
+    Returns:
+        Tuple of ((phase, max_score, tags) per item, summary embedding per item);
+        both lists are aligned with items, embeddings are None where there is no summary
+    """
+    results = [('phase1_basic', 0.0, [])] * len(items)
+    embeddings = [None] * len(items)
+    indices = [i for i, item in enumerate(items) if item.get('summary')]
+    if not indices:
+        return results, embeddings
     
     # Normalize summary text
-    summary = item['summary']
+    summaries = [items[i]['summary'] for i in indices]
     if HAS_STRINGZILLA:
-        summary = sz.normalize(summary)
+        summaries = [sz.normalize(summary) for summary in summaries]
     
-    # Embed and compute similarity
-    item_emb = embed_model.encode(summary)
-    scores = util.cos_sim(item_emb, vision_embeds)[0]
-    max_score = float(scores.max().item())
+    # Embed and compute the (items x keywords) similarity matrix in one pass
+    from sentence_transformers import util
+    item_embs = get_embed_model().encode(summaries)
+    score_matrix = util.cos_sim(item_embs, get_vision_embeds()).tolist()
     
-    # Segment for further processing
-    phase = 'phase1_basic' if max_score > 0.5 else 'phase2_deep'
+    for i, item_emb, scores in zip(indices, item_embs, score_matrix):
+        max_score = max(scores)
+        
+        # Segment for further processing
+        phase = 'phase1_basic' if max_score > 0.5 else 'phase2_deep'
+        
+        # Consolidate tags (threshold: 0.5)
+        tags = [VISION_KEYWORDS[k] for k, score in enumerate(scores) if score > 0.5]
+        
+        logger.info("Item %s: Relevance %.3f, phase %s, tags %s", items[i].get('url', 'unknown'), max_score, phase, tags)
+        results[i] = (phase, max_score, tags)
+        embeddings[i] = item_emb
     
-    # Consolidate tags (threshold: 0.5)
-    tags = [VISION_KEYWORDS[i] for i, score in enumerate(scores) if float(score.item()) > 0.5]
+    return results, embeddings
+
+
+def _embed_summaries(items: List[Dict]) -> List:
+    """
+    Embed every non-empty summary with a single model call.
     
-    logger.info(f"Item {item.get('url', 'unknown')}: Relevance {max_score:.3f}, phase {phase}, tags {tags}")
-    return phase, max_score, tags
+    Args:
+        items: List of dictionaries with 'summary' keys
+        
+    Returns:
+        List of embeddings aligned with items (None where there is no summary)
+    """
+    embeddings = [None] * len(items)
+    indices = [i for i, item in enumerate(items) if item.get('summary')]
+    if indices:
+        vectors = get_embed_model().encode([items[i]['summary'] for i in indices])
+        for i, vector in zip(indices, vectors):
+            embeddings[i] = vector
+    return embeddings
+
+
+def _score_and_embed(items: List[Dict]) -> Tuple[List[Tuple[str, float, List[str]]], List]:
+    """
+    Relevance results plus storage embeddings for items.
+    
+    Storage embeddings are of the raw summary; they reuse the scoring pass unless
+    stringzilla normalization made the scored text differ.
+    
+    Args:
+        items: List of dictionaries with 'summary' keys
+        
+    Returns:
+        Tuple of (relevance per item, storage embedding per item)
+    """
+    relevance, item_embs = categorize_relevance_batch(items)
+    embeddings = _embed_summaries(items) if HAS_STRINGZILLA else item_embs
+    return relevance, embeddings
+
+
+def _insert_chunk(chunk: List[Dict]) -> int:
+    """
+    Insert one chunk of bookmarks, falling back to per-row inserts on failure.
+    
+    Args:
+        chunk: List of Supabase-ready bookmark rows
+        
+    Returns:
+        Number of rows successfully inserted
+    """
+    try:
+        supabase.table('bookmarks').insert(chunk).execute()
+        logger.info("Inserted chunk of %d items to Supabase", len(chunk))
+        return len(chunk)
+    except Exception as e:
+        logger.error("Error inserting to Supabase: %s", e)
+    
+    # Try individual inserts as fallback
+    successful = 0
+    for item in chunk:
+        try:
+            supabase.table('bookmarks').insert(item).execute()
+            successful += 1
+        except Exception as e2:
+            logger.error("Error inserting individual item: %s", e2)
+    return successful
 
 
 def ingest_to_db(data: List[Dict]) -> int:
@@ -230,11 +373,34 @@ def ingest_to_db(data: List[Dict]) -> int:
         Number of items successfully ingested
     """
     insert_data = []
+    scores = []
     successful = 0
+    # One timestamp per batch, shared by its rows and its hunch record
+    batch_timestamp = datetime.utcnow().isoformat()
+    
+    # The model itself must load; only bad rows fall back to per-item processing
+    try:
+        get_embed_model()
+        get_vision_embeds()
+    except Exception as e:
+        logger.error("Embedding model unavailable, skipping batch of %d items: %s", len(data), e)
+        return 0
+    
+    # Score and embed the whole batch with as few model calls as possible
+    try:
+        relevance, embeddings = _score_and_embed(data)
+    except Exception as e:
+        logger.error("Batch embedding failed, falling back to per-item processing: %s", e)
+        relevance, embeddings = None, None
     
-    for item in data:
+    for i, item in enumerate(data):
         try:
-            phase, score, tags = categorize_relevance(item)
+            if relevance is None:
+                (item_relevance,), (embedding,) = _score_and_embed([item])
+            else:
+                item_relevance, embedding = relevance[i], embeddings[i]
+            phase, score, tags = item_relevance
+            scores.append(score)
             
             # Prepare data for Supabase
             supabase_item = {
@@ -243,55 +409,44 @@ def ingest_to_db(data: List[Dict]) -> int:
                 'tags': tags,
                 'phase': phase,
                 'relevance_score': score,
-                'timestamp': datetime.utcnow().isoformat()
+                'timestamp': batch_timestamp
             }
             
-            # Generate embedding
-            if item.get('summary'):
-                embedding = embed_model.encode(item['summary']).tolist()
-                supabase_item['embedding'] = embedding
+            # Attach embedding
+            if embedding is not None:
+                supabase_item['embedding'] = embedding.tolist()
             
             insert_data.append(supabase_item)
             
         except Exception as e:
-            logger.error(f"Error processing item {item.get('url', 'unknown')}: {e}")
+            logger.error("Error processing item %s: %s", item.get('url', 'unknown'), e)
             continue
     
-    # Batch insert to Supabase
+    # Batch insert to Supabase (chunks are independent, so overlap their round-trips)
     if insert_data:
-        try:
-            # Insert in chunks to avoid payload limits
-            chunk_size = 50
-            for i in range(0, len(insert_data), chunk_size):
-                chunk = insert_data[i:i+chunk_size]
-                result = supabase.table('bookmarks').insert(chunk).execute()
-                successful += len(chunk)
-                logger.info(f"Inserted chunk of {len(chunk)} items to Supabase")
-        except Exception as e:
-            logger.error(f"Error inserting to Supabase: {e}")
-            # Try individual inserts as fallback
-            for item in insert_data:
-                try:
-                    supabase.table('bookmarks').insert(item).execute()
-                    successful += 1
-                except Exception as e2:
-                    logger.error(f"Error inserting individual item: {e2}")
+        chunks = [insert_data[i:i+INSERT_CHUNK_SIZE] for i in range(0, len(insert_data), INSERT_CHUNK_SIZE)]
+        if len(chunks) == 1:
+            # Default run_ingestion_pass1 batches fit in one request; nothing to overlap
+            successful = _insert_chunk(chunks[0])
+        else:
+            with ThreadPoolExecutor(max_workers=min(INSERT_MAX_WORKERS, len(chunks))) as executor:
+                successful = sum(executor.map(_insert_chunk, chunks))
     
     # Log hunch for leaps
     try:
-        avg_relevance = sum(score for _, score, _ in [categorize_relevance(d) for d in data]) / len(data) if data else 0.0
+        avg_relevance = sum(scores) / len(scores) if scores else 0.0
         hunch_content = f"Ingestion pass #1 complete: {successful} items ingested, avg relevance {avg_relevance:.3f}"
         supabase.table('hunches').insert({
             'content': hunch_content,
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': batch_timestamp,
             'status': 'completed',
             'cost': 0.0  # Track costs in future
         }).execute()
-        logger.info(f"Logged hunch: {hunch_content}")
+        logger.info("Logged hunch: %s", hunch_content)
     except Exception as e:
-        logger.error(f"Error logging hunch: {e}")
+        logger.error("Error logging hunch: %s", e)
     
-    logger.info(f"Ingestion complete: {successful}/{len(data)} items successfully ingested")
+    logger.info("Ingestion complete: %d/%d items successfully ingested", successful, len(data))
     return successful
 
 
@@ -306,19 +461,28 @@ def run_ingestion_pass1(source: str = 'dewey_json.json', chunk_size: int = 50) -
     Returns:
         Dictionary with ingestion results
     """
-    logger.info(f"Starting ingestion pass #1 from source: {source}")
+    logger.info("Starting ingestion pass #1 from source: %s", source)
     
     # Pull data
     data = pull_data(source)
     if not data:
-        logger.warning(f"No data pulled from {source}")
+        logger.warning("No data pulled from %s", source)
+        return {'success': False, 'items_processed': 0, 'items_ingested': 0}
+    
+    # Load the embedding model once, now that there is data to embed; a missing
+    # or undownloadable model fails the run here instead of once per item
+    try:
+        get_embed_model()
+        get_vision_embeds()
+    except Exception as e:
+        logger.error("Could not load embedding model: %s", e)
         return {'success': False, 'items_processed': 0, 'items_ingested': 0}
     
     # Process in chunks
     total_ingested = 0
     for i in range(0, len(data), chunk_size):
         chunk = data[i:i+chunk_size]
-        logger.info(f"Processing chunk {i//chunk_size + 1} ({len(chunk)} items)")
+        logger.info("Processing chunk %d (%d items)", i//chunk_size + 1, len(chunk))
         ingested = ingest_to_db(chunk)
         total_ingested += ingested
     
@@ -327,11 +491,15 @@ def run_ingestion_pass1(source: str = 'dewey_json.json', chunk_size: int = 50) -
         result = supabase.table('bookmarks').select('*').limit(1000).execute()
         export_data = [dict(row) for row in result.data]
         
-        with open('claude_export.json', 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2, default=str)
-        logger.info(f"Exported {len(export_data)} items to claude_export.json")
+        if HAS_ORJSON:
+            with open('claude_export.json', 'wb') as f:
+                f.write(orjson.dumps(export_data, option=orjson.OPT_INDENT_2, default=str))
+        else:
+            with open('claude_export.json', 'w', encoding='utf-8') as f:
+                json.dump(export_data, f, indent=2, default=str)
+        logger.info("Exported %d items to claude_export.json", len(export_data))
     except Exception as e:
-        logger.error(f"Error creating Claude export: {e}")
+        logger.error("Error creating Claude export: %s", e)
     
     results = {
         'success': True,
@@ -340,7 +508,7 @@ def run_ingestion_pass1(source: str = 'dewey_json.json', chunk_size: int = 50) -
         'source': source
     }
     
-    logger.info(f"Ingestion pass #1 complete: {results}")
+    logger.info("Ingestion pass #1 complete: %s", results)
     return results
 
 
@@ -362,30 +530,33 @@ Task: From uploaded json, query 'best vector libs'—return summaries/tags/relev
 
 
 if __name__ == "__main__":
-    import sys
-    
     # Allow source to be passed as command line argument
     source = sys.argv[1] if len(sys.argv) > 1 else 'dewey_json.json'
     chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 50
     
-    logger.info("=" * 60)
-    logger.info("Gematria Hive - Ingestion Pass #1")
-    logger.info("=" * 60)
+    logger.info("%s\nGematria Hive - Ingestion Pass #1\n%s", BANNER_RULE, BANNER_RULE)
     
     results = run_ingestion_pass1(source=source, chunk_size=chunk_size)
     
-    print("\n" + "=" * 60)
-    print("Ingestion Results:")
-    print("=" * 60)
-    print(f"Source: {results['source']}")
-    print(f"Items Processed: {results['items_processed']}")
-    print(f"Items Ingested: {results['items_ingested']}")
-    print(f"Success: {results['success']}")
-    print("=" * 60)
+    lines = [
+        "",
+        BANNER_RULE,
+        "Ingestion Results:",
+        BANNER_RULE,
+        f"Source: {results.get('source', source)}",
+        f"Items Processed: {results['items_processed']}",
+        f"Items Ingested: {results['items_ingested']}",
+        f"Success: {results['success']}",
+        BANNER_RULE,
+    ]
     
     if results['success']:
-        print("\n✅ Ingestion complete! Check ingestion_log.txt for details.")
-        print("📊 Data exported to claude_export.json for Claude skills.")
+        lines += [
+            "",
+            "✅ Ingestion complete! Check ingestion_log.txt for details.",
+            "📊 Data exported to claude_export.json for Claude skills.",
+        ]
     else:
-        print("\n❌ Ingestion failed. Check ingestion_log.txt for errors.")
-
+        lines += ["", "❌ Ingestion failed. Check ingestion_log.txt for errors."]
+    
+    sys.stdout.write("\n".join(lines) + "\n")